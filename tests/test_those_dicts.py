@@ -1,7 +1,12 @@
+import copy
+import pickle
+import shelve
+import weakref
 from collections.abc import Iterable
 
 from those_dicts import GraphDict, BatchedDict, TwoWayDict, OOMDict
 from itertools import combinations
+from unittest import mock
 import pytest
 
 
@@ -131,6 +136,10 @@ def examine_dict_compatibility(d: type):
     if not hasattr(d, "copy"):
         raise AttributeError("copy method is missing.")
 
+    # weak references
+    if weakref.ref(d)() is not d:
+        raise TypeError("Failed to weakref.")
+
 
 def test_batched_dict():
     d = BatchedDict(x=0)
@@ -152,6 +161,19 @@ def test_batched_dict():
     g = BatchedDict([(a, b) for a, b in combinations(range(4), 2)])
     assert g == {0: [1, 2, 3], 1: [2, 3], 2: [3]}
 
+    graph = GraphDict()
+    graph["a"] = 1
+    graph["a"] = 2
+    u = BatchedDict(x=0)
+    u.update(graph)
+    assert sorted(u["a"]) == [1, 2] and u["x"] == [0]
+    assert sorted(BatchedDict(graph)["a"]) == [1, 2]
+    n = BatchedDict(nested=True)
+    n["k"] = {"inner": graph}
+    assert sorted(n["k"]["inner"]["a"]) == [1, 2]
+    n["g"] = graph
+    assert sorted(n["g"]["a"]) == [1, 2]
+
 
 def test_graph_dict():
     g = GraphDict()
@@ -162,12 +184,21 @@ def test_graph_dict():
     assert g["key"] == {"value", "value2", "value3"}
     assert g["value3"] == {"key"}
 
+    for key, value in (("key", []), ([], "key")):
+        with pytest.raises(TypeError, match="must be hashable"):
+            g[key] = value
+    assert g == {"key": {"value", "value2", "value3"}, "value": None, "value2": None, "value3": {"key"}}
+    assert g._incoming == {"value": {"key"}, "value2": {"key"}, "value3": {"key"}, "key": {"value3"}}
+
     g.delete_link("key", "value")
     assert g["key"] == {"value2", "value3"}
 
     g.disconnect("key", "value3")
     assert g["key"] == {"value2"}
     assert g["value3"] is None
+    # leaves are stored as None, not as empty sets
+    assert dict.__getitem__(g, "value3") is None
+    assert dict.__getitem__(g, "value") is None
 
     g.reindex()
     assert g.get_dict() == {"key": {"value2"}}
@@ -180,6 +211,28 @@ def test_graph_dict():
     assert g["key"] == {"value", "value2", "value3"}
     assert g["value2"] == {"value3"}
 
+    nodes, indptr, indices = g.to_csr()
+    assert len(indptr) == len(nodes) + 1
+    assert {
+        (nodes[i], nodes[j])
+        for i in range(len(nodes))
+        for j in indices[indptr[i] : indptr[i + 1]]
+    } == set(g.items())
+
+    for h in (pickle.loads(pickle.dumps(g)), copy.copy(g), copy.deepcopy(g)):
+        assert h == g and type(h) is GraphDict
+        del h["key"]
+        assert g["key"] == {"value", "value2", "value3"}
+        assert set(g.values()) == {"value", "value2", "value3"}
+
+    for v in g.values():
+        del g[v]
+    assert g.get_dict() == {}
+
+    g.clear()
+    with pytest.raises(KeyError):
+        g.popitem()
+
 
 def test_big_graph_dict():
     g = GraphDict({k: v for k, v in zip(range(1000), range(1000, 2000))})
@@ -219,6 +272,17 @@ def test_two_way_dict():
     d["key"] = "value"
     assert d["value"] == "key"
 
+    for key, value in (("key", []), ([], "key")):
+        with pytest.raises(TypeError, match="must be hashable"):
+            d[key] = value
+    assert d == {"key": {"value"}, "value": {"key"}}
+    assert d._incoming == {"value": {"key"}, "key": {"value"}}
+
+    # a pair broken in one direction gets re-paired
+    d.delete_link("value", "key")
+    d["key"] = "value"
+    assert d["value"] == "key"
+
     d2 = {"key": "value2", "key2": "value3", "key3": "value4"}
     d.update(d2)
 
@@ -232,6 +296,11 @@ def test_two_way_dict():
     d3 = {**d2, **{v: k for k, v in d2.items()}}
     assert d.get_dict() == d3
 
+    for t in (pickle.loads(pickle.dumps(d)), copy.copy(d), copy.deepcopy(d)):
+        assert t == d and type(t) is TwoWayDict
+        t["key"] = "value5"
+        assert d["key"] == "value2" and d["value2"] == "key"
+
 
 def test_oom_dict():
     d = OOMDict(max_ram_entries=10)
@@ -248,6 +317,21 @@ def test_oom_dict():
     with pytest.raises(KeyError):
         _ = b['1000']
 
+    # nothing spilled to disk, so misses must not touch the shelve at all
+    assert not b.disk_access_indicator
+    with mock.patch.object(shelve.Shelf, "__contains__", side_effect=AssertionError), \
+            mock.patch.object(shelve.Shelf, "__delitem__", side_effect=AssertionError), \
+            mock.patch.object(shelve.Shelf, "pop", side_effect=AssertionError):
+        with pytest.raises(KeyError):
+            del b['1000']
+        with pytest.raises(KeyError):
+            b.pop('1000')
+        assert '1000' not in b
+
+    # a stored value must never be mistaken for a missing one
+    s = OOMDict()
+    s['a'] = "__special_indicator__"
+    assert s['a'] == "__special_indicator__"
 
 
 def test_dict_compatibility():
@@ -1,17 +1,24 @@
 import os
+import pickle
 import shelve
+import weakref
+from array import array
 from collections.abc import Mapping, Iterable, Hashable, Generator
 from itertools import chain
 from tempfile import NamedTemporaryFile
 from types import MappingProxyType
 from typing import Any, Union, Optional
 
+_MISSING = object()
+
 
 class BatchedDict(dict):
     """
     a dict subclass that aggregates values of the same key into lists or nested dicts.
     """
 
+    __slots__ = ("nested", "__weakref__")
+
     def __init__(
         self,
         __m: Optional[Union[Mapping, Iterable]] = None,
@@ -29,6 +36,36 @@ class BatchedDict(dict):
         self.nested = nested
         self.update(__m, **kwargs)
 
+    @classmethod
+    def _from_plain_dict(cls, d: dict, nested: bool = False) -> "BatchedDict":
+        """
+        Builds a BatchedDict from a plain dict in one go, skipping update and __setitem__ dispatch.
+        Keys of a plain dict are unique, so every value simply starts its own list (or nested BatchedDict).
+        Other dict subclasses (e.g. GraphDict) may repeat keys in items(), so they go through update instead.
+
+        Parameters
+        ----------
+        d: dict
+        nested: bool
+
+        Returns
+        -------
+        BatchedDict
+        """
+        if type(d) is not dict:
+            return cls(d, nested=nested)
+
+        self = cls.__new__(cls)
+        dict.__init__(
+            self,
+            {
+                k: cls._from_plain_dict(v, nested) if nested and isinstance(v, dict) else [v]
+                for k, v in d.items()
+            },
+        )
+        self.nested = nested
+        return self
+
     def __setitem__(self, key: Hashable, value: Any):
         """
         Overrides default dict __setitem__ to support nested dicts or lists.
@@ -38,23 +75,37 @@ class BatchedDict(dict):
         key: Hashable
         value: Any
         """
-        if key in self:
-            if self.nested and isinstance(value, dict):
-                if not isinstance(self[key], dict):
-                    raise TypeError(
-                        f"Cannot nest a dict into existing value of type {type(self[key])}."
-                    )
-                self[key].update(value)
+        if self.nested:
+            self._set_nested(key, value)
+        else:
+            dict.setdefault(self, key, []).append(value)
 
-            else:
-                self[key].append(value)
+    def _set_nested(self, key: Hashable, value: Any):
+        """
+        __setitem__ specialized for nested=True: dict values are aggregated into nested BatchedDicts.
 
-        else:
-            if self.nested and isinstance(value, dict):
-                dict.__setitem__(self, key, BatchedDict(value, nested=True))
+        Parameters
+        ----------
+        key: Hashable
+        value: Any
+        """
+        current = dict.get(self, key, _MISSING)
+        if current is _MISSING:
+            if isinstance(value, dict):
+                dict.__setitem__(self, key, BatchedDict._from_plain_dict(value, nested=True))
             else:
                 dict.__setitem__(self, key, [value])
 
+        elif isinstance(value, dict):
+            if not isinstance(current, dict):
+                raise TypeError(
+                    f"Cannot nest a dict into existing value of type {type(current)}."
+                )
+            current.update(value)
+
+        else:
+            current.append(value)
+
     def setdefault(self, __key, __default=None):
         raise NotImplementedError(
             f"{self.__class__} does not support setdefault! Use .get(key, default) instead."
@@ -69,28 +120,105 @@ class BatchedDict(dict):
         __m: Mapping | Iterable | None
         **kwargs: Any
         """
-        if isinstance(__m, Mapping):
-            for k, v in __m.items():
-                self[k] = v
-        elif isinstance(__m, Iterable):
+        # bound once per call; still dispatches to __setitem__ overrides of subclasses
+        setitem = self.__setitem__
+
+        # duck typing instead of isinstance checks against the Mapping / Iterable ABCs
+        items = getattr(__m, "items", None)
+        if __m is None:
+            pass
+        elif type(__m) is dict and not self.nested:
+            # keys of a plain dict are unique, so new keys can be stored in bulk
+            if not self:
+                dict.update(self, {k: [v] for k, v in items()})
+            else:
+                existing = [(k, v) for k, v in items() if k in self]
+                dict.update(self, {k: [v] for k, v in items() if k not in self})
+                for k, v in existing:
+                    dict.__getitem__(self, k).append(v)
+        elif items is not None:
+            # other mappings (e.g. GraphDict.items()) may yield the same key more than once
+            for k, v in items():
+                setitem(k, v)
+        else:
             for k, v in __m:
-                self[k] = v
+                setitem(k, v)
 
         for k, v in kwargs.items():
-            self[k] = v
+            setitem(k, v)
 
 
 class GraphDict(dict):
     """
     a dict subclass for hashable keys and values (everything is a key TBH) that allows efficiently access
     arbitrary destination nodes, based on their source (dict key).
+    Every node is stored once as a key, values are sets of references to other keys.
+    Nodes without outgoing links store None instead of an empty set, so leaves cost no set allocation.
     """
-    # TODO refactor it to use weakref instead of indices
+
+    __slots__ = ("_incoming", "__weakref__")
 
     def __init__(self, __m: Optional[Union[Mapping, Iterable]] = None, **kwargs):
         super().__init__()
+        # destination -> sources linking to it, kept in sync with every link change
+        self._incoming = {}
         self.update(__m, **kwargs)
 
+    def __reduce__(self):
+        """
+        Pickles and copies only the nodes with their links; the incoming links index is rebuilt from them.
+
+        Returns
+        -------
+        tuple
+        """
+        return self.__class__, (), dict(dict.items(self))
+
+    def __setstate__(self, state: dict[Hashable, Optional[set[Hashable]]]):
+        """
+        Restores nodes and links produced by __reduce__ with fresh link sets and incoming links index.
+
+        Parameters
+        ----------
+        state: dict
+        """
+        for key, targets in state.items():
+            if targets:
+                targets = set(targets)
+                for target in targets:
+                    self._add_incoming(target, key)
+            dict.__setitem__(self, key, targets)
+
+    def _add_incoming(self, value: Hashable, key: Hashable):
+        """
+        Registers key as a source of an incoming link to value.
+
+        Parameters
+        ----------
+        value: Hashable
+        key: Hashable
+        """
+        sources = self._incoming.get(value)
+        if sources is None:
+            self._incoming[value] = {key}
+        else:
+            sources.add(key)
+
+    def _discard_incoming(self, value: Hashable, key: Hashable):
+        """
+        Unregisters key as a source of an incoming link to value, if registered.
+
+        Parameters
+        ----------
+        value: Hashable
+        key: Hashable
+        """
+        sources = self._incoming.get(value)
+        if sources is not None:
+            sources.discard(key)
+            if not sources:
+                del self._incoming[value]
+
     def __setitem__(self, key: Hashable, value: Hashable):
         """
         Overrides default dict __setitem__ to enforce everything-is-a-key behavior.
@@ -100,41 +228,68 @@ class GraphDict(dict):
         key: Hashable
         value: Hashable
         """
-        if not isinstance(key, Hashable) or not isinstance(value, Hashable):
-            raise TypeError("Both keys and values must be hashable!")
         if key is None:
             raise TypeError("Key cannot be None!")
 
-        if key in self and value in self:
-            dict.__getitem__(self, key).update({list(self).index(value)})
-        elif key in self and value not in self:
-            if value is not None:
-                dict.__setitem__(self, value, set())
-                dict.__getitem__(self, key).update({list(self).index(value)})
+        # unhashable nodes fail on the first lookup, before anything is stored
+        try:
+            if value is None:
+                if not dict.__contains__(self, key):
+                    dict.__setitem__(self, key, None)
             else:
-                pass
-        elif key not in self and value in self:
-            dict.__setitem__(self, key, {list(self).index(value)})
-        else:
-            if value is not None:
-                dict.__setitem__(self, value, set())
-                dict.__setitem__(self, key, {list(self).index(value)})
-            else:
-                dict.__setitem__(self, key, set())
+                self._add_edge(key, value)
+        except TypeError:
+            raise TypeError("Both keys and values must be hashable!") from None
+
+    def _add_edge(self, key: Hashable, value: Hashable):
+        """
+        Adds a directed link from key to value, creating missing nodes.
+        Assumes value is not None.
+
+        Parameters
+        ----------
+        key: Hashable
+        value: Hashable
+        """
+        targets = dict.get(self, key)
+        # registers value as a node (a leaf) only if it is not one already
+        dict.setdefault(self, value, None)
+        if targets is None:
+            targets = set()
+            dict.__setitem__(self, key, targets)
+
+        targets.add(value)
+        self._add_incoming(value, key)
+
+    def _isolate(self, key: Hashable):
+        """
+        Removes all links from and to the key, leaving it as a lone node.
+
+        Parameters
+        ----------
+        key: Hashable
+        """
+        targets = dict.__getitem__(self, key)
+        if targets:
+            for target in targets:
+                self._discard_incoming(target, key)
+            dict.__setitem__(self, key, None)
+
+        for source in self._incoming.pop(key, ()):
+            source_targets = dict.__getitem__(self, source)
+            source_targets.discard(key)
+            if not source_targets:
+                dict.__setitem__(self, source, None)
 
     def __delitem__(self, key: Hashable):
         """
-        Overrides default dict __delitem__ to prevent changing indices on deletion.
+        Overrides default dict __delitem__ to remove all links from and to the key, keeping it as a lone node.
 
         Parameters
         ----------
         key: Hashable
         """
-        del_idx = list(self).index(key)
-        # dict.__delitem__(self, key)  # changes indices!
-        dict.__setitem__(self, key, set())  # keeps indices but also a lone node
-        for _key in self:
-            dict.__getitem__(self, _key).discard(del_idx)
+        self._isolate(key)
 
     def __getitem__(self, item: Hashable) -> Union[set, None]:
         """
@@ -145,16 +300,14 @@ class GraphDict(dict):
         item: Hashable
         """
         targets = dict.__getitem__(self, item)
-        if len(targets):
-            return set(list(self)[idx] for idx in targets)
+        if targets:
+            return set(targets)
         else:
             return None
 
-        # return set(list(self)[idx] for idx in targets)
-
     def pop(self, __key: Hashable) -> Union[Hashable, set[Hashable]]:
         """
-        Overrides default dict pop to adjust for __getitem__. Due to reindexing, this is an expensive operation.
+        Overrides default dict pop to adjust for __getitem__. Due to scanning for lone nodes, this is an expensive operation.
 
         Parameters
         ----------
@@ -171,21 +324,30 @@ class GraphDict(dict):
 
     def popitem(self):
         """
-        Overrides default dict popitem to adjust for __getitem__. Due to reindexing, this is an expensive operation.
+        Overrides default dict popitem to adjust for __getitem__. Due to removing links to the popped key,
+        this is an expensive operation.
 
         Returns
         -------
         tuple
         """
-        key = list(self)[-1]
+        try:
+            key = next(reversed(dict.keys(self)))
+        except StopIteration:
+            raise KeyError("popitem(): dictionary is empty") from None
         val = self[key]
-        idx = len(self) - 1
+        self._isolate(key)
         dict.__delitem__(self, key)
-        for k in self:
-            dict.__getitem__(self, k).discard(idx)
 
         return key, val
 
+    def clear(self):
+        """
+        Overrides default dict clear to also drop the incoming links index.
+        """
+        dict.clear(self)
+        self._incoming.clear()
+
     def keys(self) -> MappingProxyType:
         """
         Overrides default dict keys to return only keys that holds a value.
@@ -196,7 +358,7 @@ class GraphDict(dict):
         -------
         MappingProxyType
         """
-        return dict.fromkeys(key for key in self if self[key] is not None).keys()
+        return dict.fromkeys(key for key, targets in dict.items(self) if targets).keys()
 
     def values(self) -> MappingProxyType:
         """
@@ -208,10 +370,8 @@ class GraphDict(dict):
         -------
         MappingProxyType
         """
-        self_list = list(self)
-        has_key = set(self_list[k] for key in self for k in dict.__getitem__(self, key))
-        has_key = [key for key in has_key]
-        return dict.fromkeys(has_key).keys()
+        # a snapshot, so the graph can be modified while iterating over it
+        return dict.fromkeys(self._incoming).keys()
 
     def items(self) -> MappingProxyType:
         """
@@ -222,23 +382,12 @@ class GraphDict(dict):
         -------
         MappingProxyType
         """
-
-        def setize(elem):
-            if isinstance(elem, set):
-                return elem
-            elif elem is None:
-                return set()
-            else:
-                return {elem}
-
-        keys = self.keys()
-        values = self.values()
-
+        # only nodes from keys() hold links, so a single pass over stored sets yields every pair
         return dict.fromkeys(
             (key, value)
-            for key in self
-            for value in setize(self[key])
-            if key in keys or key in values
+            for key, targets in dict.items(self)
+            if targets
+            for value in targets
         ).keys()
 
     def setdefault(self, __key: Hashable, __default: Optional[Hashable] = None):
@@ -255,10 +404,12 @@ class GraphDict(dict):
         keys: Iterable | None
         """
         if keys is None:
-            keys = list(self)
-
-        for key in keys:
-            self[key] = key
+            # existing nodes are already validated and no node gets created
+            for key in self:
+                self._add_edge(key, key)
+        else:
+            for key in keys:
+                self[key] = key
 
     def delete_link(self, key: Hashable, value: Hashable):
         """
@@ -269,13 +420,15 @@ class GraphDict(dict):
         key: Hashable
         value: Hashable
         """
-        if key not in self:
+        if not dict.__contains__(self, key):
             pass
         else:
             current = dict.__getitem__(self, key)
-            if value in self:
-                current.discard(list(self).index(value))
-            dict.__setitem__(self, key, current)
+            if current:
+                current.discard(value)
+                self._discard_incoming(value, key)
+                if not current:
+                    dict.__setitem__(self, key, None)
 
     def disconnect(self, key1: Hashable, key2: Hashable):
         """
@@ -300,16 +453,16 @@ class GraphDict(dict):
         __m: Mapping | Iterable | None
         **kwargs: Any
         """
-        if isinstance(__m, Mapping):
-            for k, v in __m.items():
-                self[k] = v
-
-        elif isinstance(__m, Iterable):
-            for k, v in __m:
-                self[k] = v
+        # bound once per call; still dispatches to __setitem__ overrides of subclasses
+        setitem = self.__setitem__
+        if __m is not None:
+            # duck typing instead of isinstance checks against the Mapping / Iterable ABCs
+            items = getattr(__m, "items", None)
+            for k, v in items() if items is not None else __m:
+                setitem(k, v)
 
         for k, v in kwargs.items():
-            self[k] = v
+            setitem(k, v)
 
     def merge(self, other: dict[Hashable, Union[Hashable, set[Hashable]]]):
         """
@@ -319,52 +472,38 @@ class GraphDict(dict):
         ----------
         other: GraphDict
         """
-        for key in other:
-            other_val = other[key]
-
-            if isinstance(other_val, set):
-                for v in other_val:
-                    self[key] = v
-            elif other_val is not None:
-                self[key] = other_val
-            else:
-                continue
+        if isinstance(other, GraphDict):
+            # links stored in other GraphDict are already validated
+            for key, targets in dict.items(other):
+                if targets:
+                    for v in targets:
+                        self._add_edge(key, v)
+        else:
+            for key in other:
+                other_val = other[key]
+
+                if isinstance(other_val, set):
+                    for v in other_val:
+                        self[key] = v
+                elif other_val is not None:
+                    self[key] = other_val
+                else:
+                    continue
 
     def reindex(self):
         """
-        Scans self for disconnected nodes, delete them and fix indexing of remaining nodes.
+        Scans self for disconnected nodes and deletes them.
         """
-        no_destination_ids = set(
-            [
-                list(self).index(k)
-                for k, v in filter(lambda kv: len(kv[1]) == 0, dict.items(self))
-            ]
-        )
-        no_source_ids = set(range(len(self))) - set(
-            item for _set in dict.values(self) for item in _set
-        )
-        lone_indices = sorted(list(no_destination_ids & no_source_ids))
-
-        if len(lone_indices) != 0:
-            num_steps = [0] * (lone_indices[0] + 1)
+        if len(self._incoming) == len(self):
+            # every node has an incoming link, so none of them is disconnected
+            return
 
-            for i in range(len(lone_indices) - 1):
-                num_steps.extend([i + 1] * (lone_indices[i + 1] - lone_indices[i]))
+        lone_keys = [
+            k for k, v in dict.items(self) if not v and k not in self._incoming
+        ]
 
-            num_steps.extend([num_steps[-1] + 1] * (len(self) - lone_indices[-1] - 1))
-
-            for i, (k, v) in enumerate(dict.items(self)):
-                if i in lone_indices:
-                    continue
-
-                new_v = set()
-                for item in v:
-                    new_v.add(item - num_steps[item])
-
-                dict.__setitem__(self, k, new_v)
-
-            for i in lone_indices[::-1]:
-                dict.__delitem__(self, list(self)[i])
+        for k in lone_keys:
+            dict.__delitem__(self, k)
 
     def get_dict(self) -> dict[Hashable, Union[Hashable, set[Hashable]]]:
         """
@@ -374,8 +513,29 @@ class GraphDict(dict):
         -------
         dict
         """
-        k_with_v = [k for k in self if len(dict.__getitem__(self, k)) > 0]
-        return {k: self[k] for k in k_with_v}
+        return {k: self[k] for k, v in dict.items(self) if v}
+
+    def to_csr(self) -> tuple[list[Hashable], array, array]:
+        """
+        Exports links in compressed sparse row (CSR) layout over positions of nodes in iteration order.
+        Links of nodes[i] are nodes[j] for j in indices[indptr[i]:indptr[i + 1]].
+        Both arrays are contiguous, so they can be used by array-based graph algorithms without copying.
+
+        Returns
+        -------
+        tuple[list[Hashable], array, array]
+            nodes, indptr and indices
+        """
+        nodes = list(self)
+        position = {node: i for i, node in enumerate(nodes)}
+        indptr = array("q", [0])
+        indices = array("q")
+        for targets in dict.values(self):
+            if targets:
+                indices.extend(sorted(position[target] for target in targets))
+            indptr.append(len(indices))
+
+        return nodes, indptr, indices
 
 
 class TwoWayDict(GraphDict):
@@ -383,6 +543,8 @@ class TwoWayDict(GraphDict):
     a dict subclass that works two ways: from keys to values and in reverse
     """
 
+    __slots__ = ()
+
     def __setitem__(self, key: Hashable, value: Hashable):
         """
         Overrides default dict __setitem__ to enforce everything-is-a-key behavior.
@@ -392,37 +554,31 @@ class TwoWayDict(GraphDict):
         key: Hashable
         value: Hashable
         """
-        if not isinstance(key, Hashable) or not isinstance(value, Hashable):
-            raise TypeError("Both keys and values must be hashable!")
-
-        if key in self and value in self:
-            self.disconnect(key, value)
-            dict.__setitem__(self, key, {list(self).index(value)})
-            dict.__setitem__(self, value, {list(self).index(key)})
-        elif key in self and value not in self:
-            self.disconnect(key, self[key])
-            dict.__setitem__(self, value, {list(self).index(key)})
-            dict.__setitem__(self, key, {list(self).index(value)})
-        elif key not in self and value in self:
-            self.disconnect(value, self[value])
-            dict.__setitem__(self, key, {list(self).index(value)})
-            dict.__setitem__(self, value, {list(self).index(key)})
-        else:
-            dict.__setitem__(self, value, "")
-            dict.__setitem__(self, key, {list(self).index(value)})
-            dict.__setitem__(self, value, {list(self).index(key)})
-
-    def __delitem__(self, key: Hashable):
-        """
-        Overrides default dict __delitem__ to prevent changing indices on deletion.
-
-        Parameters
-        ----------
-        key: Hashable
-        """
-        val = self[key]
-        dict.__setitem__(self, key, set())
-        dict.__setitem__(self, val, set())
+        try:
+            targets = dict.get(self, key)
+            hash(value)
+        except TypeError:
+            raise TypeError("Both keys and values must be hashable!") from None
+
+        if (
+            targets is not None
+            and value in targets
+            and key in (dict.get(self, value) or ())
+        ):
+            # already paired in both directions
+            return
+
+        for node in (key, value):
+            partners = dict.get(self, node)
+            if partners:
+                for partner in list(partners):
+                    self.disconnect(node, partner)
+
+        # both nodes are lone now, value goes first to keep insertion order of new nodes
+        dict.__setitem__(self, value, {key})
+        self._add_incoming(key, value)
+        dict.__setitem__(self, key, {value})
+        self._add_incoming(value, key)
 
     def __getitem__(self, item: Hashable) -> Hashable:
         """
@@ -432,8 +588,8 @@ class TwoWayDict(GraphDict):
         ----------
         item: Hashable
         """
-        elem = GraphDict.__getitem__(self, item)
-        return elem.copy().pop() if elem is not None else elem
+        targets = dict.__getitem__(self, item)
+        return next(iter(targets)) if targets else None
 
     def make_loops(self, *args, **kwargs):
         """
@@ -460,12 +616,34 @@ class TwoWayDict(GraphDict):
         )
 
 
+def _close_storage(db: shelve.Shelf, storage):
+    """
+    Closes the shelve and removes its temporary file. Kept outside OOMDict, so the finalizer holds no
+    reference to the dict itself.
+
+    Parameters
+    ----------
+    db: shelve.Shelf
+    storage: NamedTemporaryFile
+    """
+    db.close()
+    storage.close()
+
+
 class OOMDict(dict):
     """
     A dict subclass that, after exceeding threshold of in-memory entries, stores the rest on the disk.
     Due to requirements of Python's dbm module in the backend of shelve - only str keys are supported.
     """
 
+    __slots__ = (
+        "max_ram_entries",
+        "disk_access_indicator",
+        "storage",
+        "_db",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         __m: Optional[Union[Mapping, Iterable]] = None,
@@ -485,9 +663,12 @@ class OOMDict(dict):
         self.max_ram_entries = max_ram_entries
         self.disk_access_indicator = False
         self.storage = NamedTemporaryFile(mode="r", encoding=None, suffix=".db")
-        with shelve.open(self.storage.name, flag="n") as _:
-            # provides proper encoding
-            ...
+        # kept open for the lifetime of the dict, so disk access does not pay for reopening the file
+        self._db = shelve.open(
+            self.storage.name, flag="n", protocol=pickle.HIGHEST_PROTOCOL
+        )
+        # closes and removes the storage file once the dict is garbage collected
+        weakref.finalize(self, _close_storage, self._db, self.storage)
         self.update(__m, **kwargs)
 
     def __setitem__(self, key: str, value: Any):
@@ -502,8 +683,7 @@ class OOMDict(dict):
         """
         if len(self) > self.max_ram_entries and not dict.__contains__(self, key):
             self.disk_access_indicator = True
-            with shelve.open(self.storage.name) as db:
-                db[key] = value
+            self._db[key] = value
         else:
             dict.__setitem__(self, key, value)
 
@@ -519,12 +699,11 @@ class OOMDict(dict):
         -------
         Any
         """
-        elem = dict.get(self, item, "__special_indicator__")
-        if elem == "__special_indicator__" and self.disk_access_indicator:
-            with shelve.open(self.storage.name) as db:
-                elem = db[item]
-        elif elem == "__special_indicator__":
-            raise KeyError
+        elem = dict.get(self, item, _MISSING)
+        if elem is _MISSING and self.disk_access_indicator:
+            elem = self._db[item]
+        elif elem is _MISSING:
+            raise KeyError(item)
 
         return elem
 
@@ -538,16 +717,10 @@ class OOMDict(dict):
         """
         if dict.__contains__(self, key):
             dict.__delitem__(self, key)
+        elif self.disk_access_indicator:
+            del self._db[key]
         else:
-            with shelve.open(self.storage.name) as db:
-                del db[key]
-
-    def __del__(self):
-        """
-        Overrides default dict __del__ to also remove the storage file.
-        """
-        self.storage.close()
-        del self
+            raise KeyError(key)
 
     def __contains__(self, item: str) -> bool:
         """
@@ -561,11 +734,9 @@ class OOMDict(dict):
         -------
         bool
         """
-        if dict.__contains__(self, item):
-            return True
-        else:
-            with shelve.open(self.storage.name) as db:
-                return item in db
+        return dict.__contains__(self, item) or (
+            self.disk_access_indicator and item in self._db
+        )
 
     def update(self, __m: Optional[Union[Mapping, Iterable]] = None, **kwargs):
         """
@@ -596,8 +767,9 @@ class OOMDict(dict):
         set[str]
         """
         mem_keys = dict.keys(self)
-        with shelve.open(self.storage.name) as db:
-            return mem_keys | db.keys()
+        if not self.disk_access_indicator:
+            return set(mem_keys)
+        return mem_keys | self._db.keys()
 
     def values(self) -> Generator:
         """
@@ -609,8 +781,10 @@ class OOMDict(dict):
         Generator
         """
         mem_vals = dict.values(self)
-        with shelve.open(self.storage.name) as db:
-            yield from chain(mem_vals, db.values())
+        if not self.disk_access_indicator:
+            yield from mem_vals
+            return
+        yield from chain(mem_vals, self._db.values())
 
     def items(self) -> Generator:
         """
@@ -622,8 +796,10 @@ class OOMDict(dict):
         Generator
         """
         mem_items = dict.items(self)
-        with shelve.open(self.storage.name) as db:
-            yield from chain(mem_items, db.items())
+        if not self.disk_access_indicator:
+            yield from mem_items
+            return
+        yield from chain(mem_items, self._db.items())
 
     def pop(self, __key: str) -> Any:
         """
@@ -639,9 +815,10 @@ class OOMDict(dict):
         """
         if dict.__contains__(self, __key):
             return dict.pop(self, __key)
+        elif self.disk_access_indicator:
+            return self._db.pop(__key)
         else:
-            with shelve.open(self.storage.name) as db:
-                return db.pop(__key)
+            raise KeyError(__key)
 
     def popitem(self) -> tuple[str, Any]:
         """
@@ -651,10 +828,8 @@ class OOMDict(dict):
         -------
         tuple[str, Any]
         """
-        if self.disk_access_indicator:
-            with shelve.open(self.storage.name) as db:
-                if len(db):
-                    return db.popitem()
+        if self.disk_access_indicator and len(self._db):
+            return self._db.popitem()
 
         return dict.popitem(self)
 
@@ -666,6 +841,7 @@ class OOMDict(dict):
         ----------
         path: str | os.PathLike
         """
-        with shelve.open(path) as db, shelve.open(self.storage.name) as self_db:
+        with shelve.open(path) as db:
             db.update(self)
-            db.update(self_db)
+            if self.disk_access_indicator:
+                db.update(self._db)